@@ -29,6 +29,9 @@ class Ballot(BaseModel):
 
     class Config:
         arbitrary_types_allowed = True
+        # ballots are never modified in place, so profiles built from existing
+        # ballots can share them instead of copying each one on validation
+        copy_on_model_validation = "none"
 
     def __eq__(self, other):
         # Check type
@@ -56,4 +59,6 @@ class Ballot(BaseModel):
         return True
 
     def __hash__(self):
-        return hash(str(self.ranking))
+        # equal sets can print their members in different orders, so hash the
+        # sets themselves rather than the ranking's string
+        return hash(tuple(map(frozenset, self.ranking)))
@@ -1,18 +1,137 @@
 from abc import abstractmethod
-from functools import reduce
+from collections import Counter
+from functools import lru_cache
 import itertools as it
 from fractions import Fraction
 import math
 import numpy as np
 from pathlib import Path
 import pickle
-import random
 from typing import Optional
 
 from .ballot import Ballot
 from .pref_profile import PreferenceProfile
 
 
+# largest number of rankings the ballot simplex enumerates (8!); beyond this
+# alpha-based draws sample rankings without building the table
+_MAX_RANKING_TABLE = 40320
+
+
+@lru_cache(maxsize=16)
+def _perm_table(num_cands: int, ballot_length: int) -> np.ndarray:
+    """
+    Every ranking of `ballot_length` out of `num_cands` candidates as rows of
+    candidate indices. Cached, since repeated simulations on the same
+    candidates would otherwise enumerate the rankings on every call
+    """
+    table = np.array(
+        list(it.permutations(range(num_cands), ballot_length)), dtype=np.int16
+    )
+    # shared between calls, so guard against in-place edits
+    table.flags.writeable = False
+    return table
+
+
+def _unique_rankings(rankings: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Distinct rows of an array of candidate indices (padded with -1) and how
+    often each occurs
+    """
+    length = rankings.shape[1]
+    base = int(rankings.max(initial=-1)) + 2
+    if length == 0 or base**length >= 2**63:
+        unique_rows, row_counts = np.unique(rankings, axis=0, return_counts=True)
+        return unique_rows, row_counts
+
+    # packing each row into one integer key lets np.unique sort plain int64
+    # values rather than whole rows
+    place_values = base ** np.arange(length - 1, -1, -1, dtype=np.int64)
+    keys = (rankings.astype(np.int64) + 1) @ place_values
+    _, first, counts = np.unique(keys, return_index=True, return_counts=True)
+    return rankings[first], counts
+
+
+class CachedChoice:
+    """
+    Weighted sampler over a fixed set of items. The distribution is validated
+    and accumulated once, so repeated draws skip the per-call setup that
+    `np.random.choice` redoes every time
+
+    Args:
+        probs: relative weight of each item, need not be normalized
+        items: (Optional) items to sample. Defaults to item indices, which are
+            returned as an integer array
+
+    **Attributes**
+
+    `items`
+    :   object array of the items to sample, or their indices
+
+    `cdf`
+    :   cumulative normalized weight of the items
+
+    `log_probs`
+    :   log of each item's normalized weight
+    """
+
+    def __init__(self, probs, items=None):
+        probs = np.asarray(probs, dtype=float)
+        probs = probs / probs.sum()
+
+        if items is None:
+            self.items = np.arange(len(probs))
+        elif isinstance(items, np.ndarray) and items.dtype == object:
+            self.items = items
+        else:
+            # object array so tuples and strings are kept as is
+            self.items = np.empty(len(probs), dtype=object)
+            self.items[:] = list(items)
+
+        self.cdf = np.cumsum(probs)
+        # an empty sampler can still be built, so branches that are never
+        # drawn from need no special casing; drawing from it raises below
+        if len(self.cdf):
+            self.cdf[-1] = 1.0
+        with np.errstate(divide="ignore"):
+            self.log_probs = np.log(probs)
+
+    def sample_with_replacement(self, size: int) -> np.ndarray:
+        """
+        Draws items independently
+
+        Args:
+            size (int): number of draws
+
+        Returns:
+            np.ndarray: array of `size` items
+        """
+        if size and not len(self.items):
+            raise ValueError("cannot draw from an empty set of items")
+        return self.items[np.searchsorted(self.cdf, np.random.random(size), "right")]
+
+    def sample_without_replacement(
+        self, size: int, k: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Draws orderings of the items, i.e. Plackett-Luce rankings
+
+        Args:
+            size (int): number of orderings to draw
+            k (int, optional): number of items in each ordering. Defaults to
+                all items
+
+        Returns:
+            np.ndarray: a (size, k) array of items, first drawn first
+        """
+        if size and not len(self.items):
+            raise ValueError("cannot draw from an empty set of items")
+        # sorting Gumbel-perturbed log probabilities draws every ordering at
+        # once (Gumbel-top-k trick); items with zero weight always come last
+        perturbed = self.log_probs + np.random.gumbel(size=(size, len(self.items)))
+        return self.items[np.argsort(-perturbed, axis=1)[:, :k]]
+
+
 class BallotGenerator:
     """
     Base class for ballot generation models that use the candidate simplex
@@ -177,25 +296,39 @@ class BallotGenerator:
         return math.ceil(num) if rand > 0.5 else math.floor(num)
 
     @staticmethod
-    def ballot_pool_to_profile(ballot_pool, candidates) -> PreferenceProfile:
+    def ballot_pool_to_profile(
+        ballot_pool, candidates, counts: Optional[np.ndarray] = None
+    ) -> PreferenceProfile:
         """
         Given a list of ballots and candidates, convert them into a `PreferenceProfile`
 
         Args:
-            ballot_pool (list of tuple): a list of ballots, with tuple as their ranking
+            ballot_pool (list of tuple or np.ndarray): a list of ballots, with tuple as
+                their ranking, or a 2-D array whose rows are rankings given as
+                indices into `candidates`, padded with -1
             candidates (list): a list of candidates
+            counts (np.ndarray, optional): number of ballots cast for each row of
+                an array `ballot_pool` whose rows are already distinct. Defaults
+                to counting the rows
 
         Returns:
             PreferenceProfile: a preference profile representing the ballots in the election
         """
-        ranking_counts: dict[tuple, int] = {}
         ballot_list: list[Ballot] = []
 
-        for ranking in ballot_pool:
-            tuple_rank = tuple(ranking)
-            ranking_counts[tuple_rank] = (
-                ranking_counts[tuple_rank] + 1 if tuple_rank in ranking_counts else 1
-            )
+        if isinstance(ballot_pool, np.ndarray):
+            # identical rows are counted in C, so Ballots are only built
+            # for the distinct rankings
+            if counts is None:
+                ballot_pool, counts = _unique_rankings(ballot_pool)
+            for ranking, count in zip(ballot_pool.tolist(), counts.tolist()):
+                rank = [{candidates[i]} for i in ranking if i >= 0]
+                ballot_list.append(Ballot(ranking=rank, weight=Fraction(count)))
+
+            return PreferenceProfile(ballots=ballot_list, candidates=candidates)
+
+        # tuples of candidates hash cheaply, so count them directly
+        ranking_counts = Counter(map(tuple, ballot_pool))
 
         for ranking, count in ranking_counts.items():
             rank = [set([cand]) for cand in ranking]
@@ -275,38 +408,75 @@ class BallotSimplex(BallotGenerator):
         return cls(alpha=alpha, **data)
 
     def generate_profile(self, number_of_ballots) -> PreferenceProfile:
-        perm_set = it.permutations(self.candidates, self.ballot_length)
+        num_rankings = math.perm(len(self.candidates), self.ballot_length)
+        if self.alpha is not None and num_rankings > _MAX_RANKING_TABLE:
+            return self.ballot_pool_to_profile(
+                self._polya_urn_rankings(number_of_ballots, num_rankings),
+                self.candidates,
+            )
 
-        perm_rankings = [list(value) for value in perm_set]
+        # rankings as rows of candidate indices
+        perm_rankings = _perm_table(len(self.candidates), self.ballot_length)
 
         if self.alpha is not None:
-            draw_probabilities = list(
-                np.random.default_rng().dirichlet([self.alpha] * len(perm_rankings))
+            draw_probabilities = np.random.default_rng().dirichlet(
+                [self.alpha] * len(perm_rankings)
             )
         elif self.point:
             # calculates probabilities for each ranking
             # using probability distribution for candidate support
-            draw_probabilities = [
-                reduce(
-                    lambda prod, cand: prod * self.point[cand] if self.point else 0,
-                    ranking,
-                    1.0,
-                )
-                for ranking in perm_rankings
-            ]
-            draw_probabilities = [
-                prob / sum(draw_probabilities) for prob in draw_probabilities
-            ]
+            support = np.array([self.point[cand] for cand in self.candidates])
+            draw_probabilities = np.prod(support[perm_rankings], axis=1)
+            draw_probabilities = draw_probabilities / draw_probabilities.sum()
 
-        ballot_pool = []
+        # one multinomial draw gives how many ballots cast each ranking
+        counts = np.random.multinomial(number_of_ballots, draw_probabilities)
+        drawn = np.flatnonzero(counts)
+
+        return self.ballot_pool_to_profile(
+            perm_rankings[drawn], self.candidates, counts=counts[drawn]
+        )
+
+    def _polya_urn_rankings(
+        self, number_of_ballots: int, num_rankings: int
+    ) -> np.ndarray:
+        """
+        Draws ballots from a symmetric Dirichlet-multinomial over all rankings
+        without enumerating them, using the equivalent Polya urn: ballot j is a
+        fresh uniformly random ranking with probability
+        num_rankings * alpha / (num_rankings * alpha + j), and otherwise a copy
+        of a uniformly chosen earlier ballot
 
-        for _ in range(number_of_ballots):
-            index = np.random.choice(
-                range(len(perm_rankings)), 1, p=draw_probabilities
-            )[0]
-            ballot_pool.append(perm_rankings[index])
+        Args:
+            number_of_ballots (int): number of ballots to draw
+            num_rankings (int): number of possible rankings
+
+        Returns:
+            np.ndarray: a (number_of_ballots, ballot_length) array of candidate
+                indices
+        """
+        assert self.alpha is not None
+        weight = num_rankings * self.alpha
+        draw = np.arange(number_of_ballots)
+        is_fresh = np.random.random(number_of_ballots) < weight / (weight + draw)
+
+        # follow each copy back to the fresh draw it descends from; sources
+        # always precede the copy, so pointer jumping settles in log steps
+        source = np.where(
+            is_fresh, draw, (np.random.random(number_of_ballots) * draw).astype(int)
+        )
+        while True:
+            next_source = source[source]
+            if np.array_equal(next_source, source):
+                break
+            source = next_source
 
-        return self.ballot_pool_to_profile(ballot_pool, self.candidates)
+        fresh = np.flatnonzero(is_fresh)
+        orderings = np.argsort(
+            np.random.random((len(fresh), len(self.candidates))), axis=1
+        )[:, : self.ballot_length]
+
+        return orderings[np.searchsorted(fresh, source)]
 
 
 class ImpartialCulture(BallotSimplex):
@@ -325,6 +495,16 @@ class ImpartialCulture(BallotSimplex):
     def __init__(self, **data):
         super().__init__(alpha=float("inf"), **data)
 
+    def generate_profile(self, number_of_ballots) -> PreferenceProfile:
+        # every ranking is equally likely, so each ballot is the head of a
+        # uniformly random permutation; sorting a matrix of uniform draws
+        # yields all of them at once without enumerating the n! rankings
+        orderings = np.argsort(
+            np.random.random((number_of_ballots, len(self.candidates))), axis=1
+        )[:, : self.ballot_length]
+
+        return self.ballot_pool_to_profile(orderings, self.candidates)
+
 
 class ImpartialAnonymousCulture(BallotSimplex):
     """
@@ -372,25 +552,19 @@ class PlackettLuce(BallotGenerator):
         for bloc in self.bloc_voter_prop.keys():
             # number of voters in this bloc
             num_ballots = self.round_num(number_of_ballots * self.bloc_voter_prop[bloc])
-            pref_interval_dict = self.pref_interval_by_bloc[bloc]
-            # creates the interval of probabilities for candidates supported by this block
-            cand_support_vec = [pref_interval_dict[cand] for cand in self.candidates]
-
-            for _ in range(num_ballots):
-                # generates ranking based on probability distribution of candidate support
-                ballot = list(
-                    np.random.choice(
-                        self.candidates,
-                        self.ballot_length,
-                        p=cand_support_vec,
-                        replace=False,
-                    )
-                )
 
-                ballot_pool.append(ballot)
+            # the sampler is built from the interval on every call, so changes
+            # to pref_interval_by_bloc are picked up; it samples candidate
+            # indices
+            interval = self.pref_interval_by_bloc[bloc]
+            orderings = CachedChoice(
+                [interval[cand] for cand in self.candidates]
+            ).sample_without_replacement(num_ballots, self.ballot_length)
+
+            ballot_pool.append(orderings)
 
         pp = self.ballot_pool_to_profile(
-            ballot_pool=ballot_pool, candidates=self.candidates
+            ballot_pool=np.concatenate(ballot_pool), candidates=self.candidates
         )
         return pp
 
@@ -448,7 +622,9 @@ class BradleyTerry(BallotGenerator):
     def generate_profile(self, number_of_ballots) -> PreferenceProfile:
 
         permutations = list(it.permutations(self.candidates, self.ballot_length))
-        ballot_pool: list[list] = []
+        # the same rankings, in the same order, as rows of candidate indices
+        perm_rankings = _perm_table(len(self.candidates), self.ballot_length)
+        ballot_pool = []
 
         for bloc in self.bloc_voter_prop.keys():
             num_ballots = self.round_num(number_of_ballots * self.bloc_voter_prop[bloc])
@@ -469,13 +645,10 @@ class BradleyTerry(BallotGenerator):
                 replace=True,
             )
 
-            rankings = list(ranking_to_prob.keys())
-            ballots = [rankings[i] for i in ballots_indices]
-
-            ballot_pool = ballot_pool + ballots
+            ballot_pool.append(perm_rankings[ballots_indices])
 
         pp = self.ballot_pool_to_profile(
-            ballot_pool=ballot_pool, candidates=self.candidates
+            ballot_pool=np.concatenate(ballot_pool), candidates=self.candidates
         )
         return pp
 
@@ -522,6 +695,12 @@ class AlternatingCrossover(BallotGenerator):
     def generate_profile(self, number_of_ballots) -> PreferenceProfile:
 
         ballot_pool = []
+        # each slate is converted to an object array once and shared by every
+        # block that samples from it
+        slate_arrs = {}
+        for slate, cands in self.slate_to_candidates.items():
+            slate_arrs[slate] = np.empty(len(cands), dtype=object)
+            slate_arrs[slate][:] = cands
 
         for bloc in self.bloc_voter_prop.keys():
 
@@ -534,55 +713,46 @@ class AlternatingCrossover(BallotGenerator):
                 crossover_rate = crossover_dict[opposing_slate]
                 num_crossover_ballots = self.round_num(crossover_rate * num_ballots)
 
-                opposing_cands = self.slate_to_candidates[opposing_slate]
-                bloc_cands = self.slate_to_candidates[bloc]
-
-                for _ in range(num_crossover_ballots):
-                    pref_for_opposing = [
-                        pref_interval_dict[cand] for cand in opposing_cands
-                    ]
-                    # convert to probability distribution
-                    pref_for_opposing = [
-                        p / sum(pref_for_opposing) for p in pref_for_opposing
-                    ]
-
-                    pref_for_bloc = [pref_interval_dict[cand] for cand in bloc_cands]
-                    # convert to probability distribution
-                    pref_for_bloc = [p / sum(pref_for_bloc) for p in pref_for_bloc]
-
-                    bloc_cands = list(
-                        np.random.choice(
-                            bloc_cands,
-                            p=pref_for_bloc,
-                            size=len(bloc_cands),
-                            replace=False,
-                        )
-                    )
-                    opposing_cands = list(
-                        np.random.choice(
-                            opposing_cands,
-                            size=len(opposing_cands),
-                            p=pref_for_opposing,
-                            replace=False,
-                        )
-                    )
+                opposing_cands = slate_arrs[opposing_slate]
+                bloc_cands = slate_arrs[bloc]
 
-                    # alternate the bloc and opposing bloc candidates to create crossover ballots
-                    if bloc != opposing_slate:  # alternate
-                        ballot = [
-                            item
-                            for pair in zip(opposing_cands, bloc_cands)
-                            for item in pair
-                            if item is not None
-                        ]
+                opposing_sampler = CachedChoice(
+                    [pref_interval_dict[c] for c in opposing_cands], opposing_cands
+                )
+                bloc_sampler = CachedChoice(
+                    [pref_interval_dict[c] for c in bloc_cands], bloc_cands
+                )
 
-                    # check that ballot_length is shorter than total number of cands
-                    ballot_pool.append(ballot)
+                # within-slate orderings for every ballot of this block at once
+                opposing_orders = opposing_sampler.sample_without_replacement(
+                    num_ballots
+                )
+                bloc_orders = bloc_sampler.sample_without_replacement(num_ballots)
+
+                # alternate the bloc and opposing bloc candidates to create
+                # crossover ballots, stopping when the shorter slate runs out
+                if bloc != opposing_slate:
+                    width = min(len(opposing_cands), len(bloc_cands))
+                    crossover = np.empty(
+                        (num_crossover_ballots, 2 * width), dtype=object
+                    )
+                    crossover[:, 0::2] = opposing_orders[:num_crossover_ballots, :width]
+                    crossover[:, 1::2] = bloc_orders[:num_crossover_ballots, :width]
+                else:
+                    crossover = bloc_orders[:num_crossover_ballots]
+                # check that ballot_length is shorter than total number of cands
+                ballot_pool.extend(crossover.tolist())
 
                 # Bloc ballots
-                for _ in range(num_ballots - num_crossover_ballots):
-                    ballot = bloc_cands + opposing_cands
-                    ballot_pool.append(ballot)
+                ballot_pool.extend(
+                    np.concatenate(
+                        [
+                            bloc_orders[num_crossover_ballots:],
+                            opposing_orders[num_crossover_ballots:],
+                        ],
+                        axis=1,
+                    ).tolist()
+                )
 
         pp = self.ballot_pool_to_profile(
             ballot_pool=ballot_pool, candidates=self.candidates
@@ -604,19 +774,15 @@ class OneDimSpatial(BallotGenerator):
     """
 
     def generate_profile(self, number_of_ballots) -> PreferenceProfile:
-        candidate_position_dict = {c: np.random.normal(0, 1) for c in self.candidates}
+        candidate_positions = np.random.normal(0, 1, len(self.candidates))
         voter_positions = np.random.normal(0, 1, number_of_ballots)
 
-        ballot_pool = []
-
-        for vp in voter_positions:
-            distance_dict = {
-                c: abs(v - vp) for c, v, in candidate_position_dict.items()
-            }
-            candidate_order = sorted(distance_dict, key=distance_dict.__getitem__)
-            ballot_pool.append(candidate_order)
+        # (voter, candidate) distances by broadcasting, then each voter ranks
+        # candidates from nearest to farthest
+        distances = np.abs(voter_positions[:, None] - candidate_positions[None, :])
+        orderings = np.argsort(distances, axis=1)
 
-        return self.ballot_pool_to_profile(ballot_pool, self.candidates)
+        return self.ballot_pool_to_profile(orderings, self.candidates)
 
 
 class CambridgeSampler(BallotGenerator):
@@ -703,41 +869,30 @@ class CambridgeSampler(BallotGenerator):
                 if ballot[0] == opp_bloc
             }
 
+            # Randomly choose first choice based off bloc crossover rate
+            opp_first = (
+                np.random.random(bloc_voters) < self.bloc_crossover_rate[bloc][opp_bloc]
+            )
+
+            # Based on first choice, randomly choose
+            # ballots weighted by Cambridge frequency
+            bloc_orderings = np.empty(bloc_voters, dtype=object)
+            bloc_orderings[~opp_first] = CachedChoice(
+                list(prob_ballot_given_bloc_first.values()),
+                prob_ballot_given_bloc_first.keys(),
+            ).sample_with_replacement(bloc_voters - opp_first.sum())
+            bloc_orderings[opp_first] = CachedChoice(
+                list(prob_ballot_given_opp_first.values()),
+                prob_ballot_given_opp_first.keys(),
+            ).sample_with_replacement(opp_first.sum())
+
+            # Turn bloc orderings into candidate orderings with PL
+            pl_orderings = CachedChoice(
+                list(pref_interval_dict.values()), pref_interval_dict.keys()
+            ).sample_without_replacement(bloc_voters, self.ballot_length)
+
             # Generate ballots
-            for _ in range(bloc_voters):
-                # Randomly choose first choice based off
-                # bloc crossover rate
-                first_choice = np.random.choice(
-                    [bloc, opp_bloc],
-                    p=[
-                        1 - self.bloc_crossover_rate[bloc][opp_bloc],
-                        self.bloc_crossover_rate[bloc][opp_bloc],
-                    ],
-                )
-                # Based on first choice, randomly choose
-                # ballots weighted by Cambridge frequency
-                if first_choice == bloc:
-                    bloc_ordering = random.choices(
-                        list(prob_ballot_given_bloc_first.keys()),
-                        weights=list(prob_ballot_given_bloc_first.values()),
-                        k=1,
-                    )[0]
-                else:
-                    bloc_ordering = random.choices(
-                        list(prob_ballot_given_opp_first.keys()),
-                        weights=list(prob_ballot_given_opp_first.values()),
-                        k=1,
-                    )[0]
-
-                # Now turn bloc ordering into candidate ordering
-                pl_ordering = list(
-                    np.random.choice(
-                        list(pref_interval_dict.keys()),
-                        self.ballot_length,
-                        p=list(pref_interval_dict.values()),
-                        replace=False,
-                    )
-                )
+            for bloc_ordering, pl_ordering in zip(bloc_orderings, pl_orderings):
                 ordered_bloc_slate = [
                     c for c in pl_ordering if c in self.slate_to_candidates[bloc]
                 ]
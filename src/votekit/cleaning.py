@@ -1,4 +1,3 @@
-from copy import deepcopy
 from fractions import Fraction
 from functools import reduce
 from itertools import groupby
@@ -23,12 +22,22 @@ def remove_empty_ballots(
         PreferenceProfile: a cleaned preference profile
     """
 
+    # copying the rankings and voters is all a deepcopy would add, at a
+    # fraction of its cost
     ballots_nonempty = [
-        deepcopy(ballot) for ballot in pp.get_ballots() if ballot.ranking
+        ballot.copy(
+            update={
+                "ranking": [set(s) for s in ballot.ranking],
+                "voters": None if ballot.voters is None else set(ballot.voters),
+            }
+        )
+        for ballot in pp.get_ballots()
+        if ballot.ranking
     ]
     if keep_candidates:
-        old_cands = deepcopy(pp.get_candidates())
-        pp_clean = PreferenceProfile(ballots=ballots_nonempty, candidates=old_cands)
+        pp_clean = PreferenceProfile(
+            ballots=ballots_nonempty, candidates=pp.get_candidates()
+        )
     else:
         pp_clean = PreferenceProfile(ballots=ballots_nonempty)
     return pp_clean
@@ -137,6 +146,10 @@ def remove_noncands(
         PreferenceProfile: a profile with non-candidates removed
     """
 
+    # TODO: adjust so string and list of strings are acceptable inputes
+    # built once rather than for every ballot
+    to_remove = [{item} for item in non_cands]
+
     def remove_from_ballots(ballot: Ballot, non_cands: list[str]) -> Ballot:
         """
         Removes non-candidiates from ballot objects.
@@ -148,12 +161,6 @@ def remove_noncands(
         Returns:
             Ballot: _description_
         """
-        # TODO: adjust so string and list of strings are acceptable inputes
-
-        to_remove = []
-        for item in non_cands:
-            to_remove.append({item})
-
         ranking = ballot.ranking
         clean_ranking = []
         for cand in ranking:
@@ -170,9 +177,11 @@ def remove_noncands(
         return clean_ballot
 
     cleaned = [
-        remove_from_ballots(ballot, non_cands)
-        for ballot in profile.ballots
-        if remove_from_ballots(ballot, non_cands).ranking
+        clean_ballot
+        for clean_ballot in (
+            remove_from_ballots(ballot, non_cands) for ballot in profile.ballots
+        )
+        if clean_ballot.ranking
     ]
     grouped_ballots = [
         list(result)
@@ -1,5 +1,6 @@
 from .election_types import (  # noqa
     STV,
+    IRV,
     SNTV,
     SequentialRCV,
     Bloc,
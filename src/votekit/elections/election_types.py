@@ -1,21 +1,22 @@
 from fractions import Fraction
-import itertools as it
 import numpy as np
 from typing import Callable, Optional
 
+from ..ballot import Ballot
 from ..models import Election
 from ..election_state import ElectionState
 from ..graphs.pairwise_comparison_graph import PairwiseComparisonGraph
 from ..pref_profile import PreferenceProfile
 from .transfers import fractional_transfer, seqRCV_transfer
 from ..utils import (
+    CandidateVotes,
     compute_votes,
     remove_cand,
     borda_scores,
     scores_into_set_list,
     tie_broken_ranking,
     elect_cands_from_set_ranking,
-    first_place_votes,
+    tally_weights,
 )
 
 
@@ -23,6 +24,13 @@ class STV(Election):
     """
     Class for single-winner IRV and multi-winner STV elections
 
+    Fractional transfers, and sequential RCV transfers on untied ballots,
+    treat identical ballots alike. So for those, anonymous ballots (no id or
+    voters) with the same ranking are merged into one ballot carrying their
+    total weight before the first round. The profile of every `ElectionState`,
+    including round 0, then holds the merged ballots rather than the input
+    ones; tallies and winners are unchanged
+
      **Attributes**
 
     `profile`
@@ -43,6 +51,13 @@ class STV(Election):
     `tiebreak`
     :   (Optional) resolves procedural and final ties by specified tiebreak
 
+    `exact`
+    :   (Optional) tallies votes as exact fractions if True, else as floats,
+        which is faster for heavily transferred ballots. Only elections run
+        over the ballot matrix (fractional or sequential RCV transfers on
+        untied ballots) tally as floats; the rest always tally exactly.
+        Defaults to True
+
     **Methods**
     """
 
@@ -54,6 +69,7 @@ class STV(Election):
         quota: str = "droop",
         ballot_ties: bool = True,
         tiebreak: str = "random",
+        exact: bool = True,
     ):
         # let parent class handle the og profile and election state
         super().__init__(profile, ballot_ties)
@@ -61,8 +77,43 @@ class STV(Election):
         self.transfer = transfer
         self.seats = seats
         self.tiebreak = tiebreak
+        self.exact = exact
         self.quota = quota.lower()
         self.threshold = self.get_threshold()
+        # seats filled so far, so rounds don't walk the whole state history
+        self._num_elected = 0
+
+        # fractional and sequential RCV transfers on untied ballots only ever
+        # rescale weights and drop candidates, so those elections run over a
+        # persistent matrix of candidate ids instead of rebuilding ballots
+        # every round
+        ballots = self._profile.get_ballots()
+        self._use_matrix = (
+            (transfer is fractional_transfer or transfer is seqRCV_transfer)
+            and any(ballot.ranking for ballot in ballots)
+            and all(len(s) == 1 for ballot in ballots for s in ballot.ranking)
+        )
+        if self._use_matrix:
+            self._encode_ballots(ballots)
+            # round 0 shows the merged ballots, as every later round does
+            if len(self._ballots) < len(ballots):
+                self._profile = PreferenceProfile(
+                    ballots=list(self._ballots), candidates=profile.candidates
+                )
+                self.state = ElectionState(curr_round=0, profile=self._profile)
+
+        # fractional transfers treat identical ballots identically, so tied
+        # rankings are condensed once rather than transferred one by one
+        elif transfer is fractional_transfer and not any(
+            ballot.id or ballot.voters for ballot in ballots
+        ):
+            condensed = PreferenceProfile(
+                ballots=ballots, candidates=profile.candidates
+            )
+            condensed.condense_ballots()
+            if len(condensed.ballots) < len(ballots):
+                self._profile = condensed
+                self.state = ElectionState(curr_round=0, profile=condensed)
 
     # can cache since it will not change throughout rounds
     def get_threshold(self) -> int:
@@ -80,6 +131,183 @@ class STV(Election):
         else:
             raise ValueError("Misspelled or unknown quota type")
 
+    def _encode_ballots(self, ballots: list) -> None:
+        """
+        Stores untied ballots as a (ballots, ranking length) matrix of candidate
+        ids padded with an always-eliminated id, alongside their weights and a
+        mask of candidates still in the running
+        """
+        self._cands = list({c for ballot in ballots for s in ballot.ranking for c in s})
+        cand_ids = {cand: i for i, cand in enumerate(self._cands)}
+        self._cand_ids = cand_ids
+        pad = len(self._cands)
+        length = max(len(ballot.ranking) for ballot in ballots)
+
+        # the smallest integer type holding every id (uint8 for under 255
+        # candidates) keeps the per-round gathers over the matrix cheap
+        self._rank_mat = np.full(
+            (len(ballots), length), pad, dtype=np.min_scalar_type(pad)
+        )
+        for i, ballot in enumerate(ballots):
+            self._rank_mat[i, : len(ballot.ranking)] = [
+                cand_ids[c] for s in ballot.ranking for c in s
+            ]
+        weights = np.array([ballot.weight for ballot in ballots], dtype=object)
+        self._ballots = list(ballots)
+
+        # identical rankings stay identical every round, so anonymous ballots
+        # are merged up front and each round scales with the distinct rankings
+        if not any(ballot.id or ballot.voters for ballot in ballots):
+            unique_mat, row_ids = np.unique(self._rank_mat, axis=0, return_inverse=True)
+            if len(unique_mat) < len(ballots):
+                self._rank_mat = unique_mat
+                weights = np.array(
+                    tally_weights(row_ids.ravel(), weights, len(unique_mat)),
+                    dtype=object,
+                )
+                self._ballots = [
+                    Ballot(
+                        ranking=[{self._cands[c]} for c in row if c != pad],
+                        weight=weight,
+                    )
+                    for row, weight in zip(unique_mat, weights)
+                ]
+
+        # whole-number weights tally exactly as floats, so they are kept as
+        # floats until a fractional transfer first rescales them
+        self._whole = self.exact and all(weight.denominator == 1 for weight in weights)
+        self._weights = (
+            weights if self.exact and not self._whole else weights.astype(np.float64)
+        )
+        self._alive = np.ones(pad + 1, dtype=bool)
+        self._alive[pad] = False
+        self._changed = np.zeros(len(self._rank_mat), dtype=bool)
+
+        # rows listing each candidate, so removing a candidate only revisits
+        # the ballots it appears on rather than scanning the whole matrix
+        flat = self._rank_mat.ravel()
+        order = np.argsort(flat, kind="stable")
+        self._cand_rows = np.split(
+            order // length, np.searchsorted(flat[order], np.arange(1, pad + 1))
+        )
+        self._first = self._first_place_ids(np.arange(len(self._rank_mat)))
+
+    def _first_place_ids(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Id of the highest ranked remaining candidate on each of the given
+        ballots, or the padding id if none remain
+        """
+        live = self._alive[self._rank_mat[rows]]
+        first = self._rank_mat[rows, live.argmax(axis=1)]
+        first[~live.any(axis=1)] = len(self._cands)
+        return first
+
+    def _matrix_votes(self) -> tuple[list, list[CandidateVotes]]:
+        """
+        Remaining candidates and their first place votes, computed from the
+        ballot matrix
+        """
+        # every encoded candidate is on some ballot and ballots are never
+        # dropped, so the remaining candidates are exactly the alive ones
+        present = np.flatnonzero(self._alive[:-1])
+        votes = tally_weights(
+            self._first,
+            self._weights,
+            len(self._cands) + 1,
+            self.exact and not self._whole,
+        )
+        if self._whole:
+            votes = [Fraction(int(total)) for total in votes]
+        self._round_votes = np.array(votes, dtype=object)
+        self._present = present
+        remaining = [self._cands[i] for i in present]
+        # stable, so tied candidates keep id order as sorted() did
+        by_votes = present[np.argsort(-self._round_votes[present], kind="stable")]
+        round_votes = [
+            CandidateVotes(cand=self._cands[i], votes=votes[i]) for i in by_votes
+        ]
+        return remaining, round_votes
+
+    def _matrix_lowest(self) -> str:
+        """
+        Uniformly random choice among the remaining candidates with the fewest
+        first place votes in the current round
+        """
+        votes = self._round_votes[self._present]
+        tied = self._present[np.flatnonzero(votes == votes.min())]
+        return self._cands[tied[np.random.randint(len(tied))]]
+
+    def _matrix_transfer(self, winner: str, votes: dict) -> None:
+        """
+        Fractional transfer from the winner on the ballot matrix
+        """
+        winner_id = self._cand_ids[winner]
+        if self.exact:
+            transfer_value = Fraction(votes[winner] - self.threshold) / Fraction(
+                votes[winner]
+            )
+        else:
+            transfer_value = (votes[winner] - self.threshold) / votes[winner]
+
+        if self._whole:
+            self._weights = np.array(
+                [Fraction(int(weight)) for weight in self._weights.tolist()],
+                dtype=object,
+            )
+            self._whole = False
+
+        # only ballots listing the winner can be led by them; removing the
+        # winner below marks those rows as changed
+        rows = self._cand_rows[winner_id]
+        self._weights[rows[self._first[rows] == winner_id]] *= transfer_value
+        self._matrix_remove(winner_id)
+
+    def _matrix_remove(self, cand_id: int) -> None:
+        """
+        Removes a candidate from every ballot in the matrix
+        """
+        self._alive[cand_id] = False
+        rows = self._cand_rows[cand_id]
+        self._changed[rows] = True
+
+        # only ballots led by the removed candidate get a new first choice
+        moved = rows[self._first[rows] == cand_id]
+        self._first[moved] = self._first_place_ids(moved)
+
+    def _matrix_profile(self) -> PreferenceProfile:
+        """
+        Profile of the current ballot matrix; only ballots that changed since
+        the last round are rebuilt
+        """
+        # plain lists, since indexing numpy arrays one element at a time is far
+        # slower than the ballots themselves
+        alive = self._alive.tolist()
+        cands = self._cands
+        changed = np.flatnonzero(self._changed)
+        rows = self._rank_mat[changed].tolist()
+        # whole-number weights only change with a transfer, so the previous
+        # ballots still hold them as Fractions
+        if self._whole:
+            weights = [self._ballots[i].weight for i in changed]
+        else:
+            weights = self._weights[changed].tolist()
+
+        # every field comes from an already validated ballot or the matrix, so
+        # the rebuilt ballots skip validation
+        for i, row, weight in zip(changed.tolist(), rows, weights):
+            old = self._ballots[i]
+            self._ballots[i] = Ballot.construct(
+                id=old.id,
+                ranking=[{cands[c]} for c in row if alive[c]],
+                weight=weight if self.exact else Fraction(weight),
+                voters=old.voters,
+            )
+        self._changed[:] = False
+
+        # the ballot list keeps changing round over round, so each state's
+        # profile gets its own copy of it
+        return PreferenceProfile.construct(ballots=list(self._ballots))
+
     def next_round(self) -> bool:
         """
         Determines if the number of seats has been met to call an election
@@ -87,10 +315,7 @@ class STV(Election):
         Returns:
             True if number of seats has been met, False otherwise
         """
-        cands_elected = 0
-        for s in self.state.get_all_winners():
-            cands_elected += len(s)
-        return cands_elected < self.seats
+        return self._num_elected < self.seats
 
     def run_step(self) -> ElectionState:
         """
@@ -99,57 +324,78 @@ class STV(Election):
         Returns:
            An ElectionState object for a given round
         """
-        remaining = self.state.profile.get_candidates()
-        ballots = self.state.profile.get_ballots()
-        round_votes = compute_votes(remaining, ballots)
+        if self._use_matrix:
+            remaining, round_votes = self._matrix_votes()
+        else:
+            remaining = self.state.profile.get_candidates()
+            ballots = self.state.profile.get_ballots()
+            # transfers rebuild Fraction weights from these tallies, and float
+            # tallies would give them float-sized denominators, so ballots
+            # off the matrix are always tallied exactly
+            round_votes = compute_votes(remaining, ballots)
+        votes_dict = {cand: votes for cand, votes in round_votes}
+        threshold = self.threshold
         elected = []
         eliminated = []
 
         # if number of remaining candidates equals number of remaining seats,
         # everyone is elected
-        if len(remaining) == self.seats - len(self.state.get_all_winners()):
+        if len(remaining) == self.seats - self._num_elected:
             elected = [{cand} for cand, votes in round_votes]
             remaining = []
             ballots = []
+            self._use_matrix = False
 
         # elect all candidates who crossed threshold
-        elif round_votes[0].votes >= self.threshold:
+        elif round_votes[0].votes >= threshold:
+            # votes are sorted, so the winners are the leading run of them
             for candidate, votes in round_votes:
-                if votes >= self.threshold:
-                    elected.append({candidate})
-                    remaining.remove(candidate)
-                    ballots = self.transfer(
-                        candidate,
-                        ballots,
-                        {cand: votes for cand, votes in round_votes},
-                        self.threshold,
-                    )
+                if votes < threshold:
+                    break
+                elected.append({candidate})
+                remaining.remove(candidate)
+                if self._use_matrix:
+                    # sequential RCV leaves the ballots untouched
+                    if self.transfer is fractional_transfer:
+                        self._matrix_transfer(candidate, votes_dict)
+                else:
+                    ballots = self.transfer(candidate, ballots, votes_dict, threshold)
         # since no one has crossed threshold, eliminate one of the people
         # with least first place votes
         elif self.next_round():
-            lp_candidates = [
-                candidate
-                for candidate, votes in round_votes
-                if votes == round_votes[-1].votes
-            ]
-
-            lp_cand = tie_broken_ranking(
-                ranking=[set(lp_candidates)],
-                profile=self.state.profile,
-                tiebreak=self.tiebreak,
-            )[-1]
+            if self._use_matrix and self.tiebreak == "random":
+                lp_cand = {self._matrix_lowest()}
+            else:
+                lp_candidates = [
+                    candidate
+                    for candidate, votes in round_votes
+                    if votes == round_votes[-1].votes
+                ]
+
+                lp_cand = tie_broken_ranking(
+                    ranking=[set(lp_candidates)],
+                    profile=self.state.profile,
+                    tiebreak=self.tiebreak,
+                )[-1]
             eliminated.append(lp_cand)
-            ballots = remove_cand(lp_cand, ballots)
+            if self._use_matrix:
+                self._matrix_remove(self._cand_ids[next(iter(lp_cand))])
+            else:
+                ballots = remove_cand(lp_cand, ballots)
             remaining.remove(next(iter(lp_cand)))
 
+        # this round's tallies are the first place votes of the previous
+        # profile, so winners are ordered without tallying it again
         if len(elected) >= 1:
             elected = scores_into_set_list(
-                first_place_votes(self.state.profile), [c for s in elected for c in s]
+                {cand: float(votes) for cand, votes in votes_dict.items()},
+                [c for s in elected for c in s],
             )
 
         # Make sure list-of-sets have non-empty elements
         elected = [s for s in elected if s != set()]
         eliminated = [s for s in eliminated if s != set()]
+        self._num_elected += sum(len(s) for s in elected)
 
         remaining = [set(remaining)]
         remaining = [s for s in remaining if s != set()]
@@ -159,7 +405,11 @@ class STV(Election):
             elected=elected,
             eliminated=eliminated,
             remaining=remaining,
-            profile=PreferenceProfile(ballots=ballots),
+            profile=(
+                self._matrix_profile()
+                if self._use_matrix
+                else PreferenceProfile(ballots=ballots)
+            ),
             previous=self.state,
         )
         return self.state
@@ -231,33 +481,51 @@ class Limited(Election):
         """
         profile = self.state.profile
         candidates = profile.get_candidates()
-        candidate_approvals = {c: Fraction(0) for c in candidates}
+        cand_ids = {c: i for i, c in enumerate(candidates)}
+        approved_ids: list[int] = []
+        approved_weights: list[Fraction] = []
 
         for ballot in profile.get_ballots():
             # First we have to determine which candidates are approved
             # i.e. in first k ranks on a ballot
+            if all(len(cand_set) == 1 for cand_set in ballot.ranking):
+                # without ties the approvals are just the first k candidates
+                approvals = [next(iter(s)) for s in ballot.ranking[: self.k]]
+                approved_ids.extend(cand_ids[cand] for cand in approvals)
+                approved_weights.extend([ballot.weight] * len(approvals))
+                continue
+
             approvals = []
-            for i, cand_set in enumerate(ballot.ranking):
-                # If list of total candidates before and including current set
-                # are less than seat count, all candidates are approved
-                if len(list(it.chain(*ballot.ranking[: i + 1]))) < self.k:
+            # number of candidates ranked before the current set
+            accepted = 0
+            for cand_set in ballot.ranking:
+                # If total candidates before and including current set
+                # are at most the seat count, all candidates are approved
+                if accepted + len(cand_set) <= self.k:
                     approvals.extend(list(cand_set))
-                # If list of total candidates before current set
-                # are greater than seat count, no candidates are approved
-                elif len(list(it.chain(*ballot.ranking[:i]))) > self.k:
-                    approvals.extend([])
+                # If total candidates before current set reach the seat count,
+                # no later candidates are approved
+                elif accepted >= self.k:
+                    break
                 # Else we know the cutoff is in the set, we compute and randomly
                 # select the number of candidates we can select
                 else:
-                    accepted = len(list(it.chain(*ballot.ranking[:i])))
                     num_to_allow = self.k - accepted
                     approvals.extend(
                         np.random.choice(list(cand_set), num_to_allow, replace=False)
                     )
+                accepted += len(cand_set)
 
             # Add approval votes equal to ballot weight (i.e. number of voters with this ballot)
-            for cand in approvals:
-                candidate_approvals[cand] += ballot.weight
+            approved_ids.extend(cand_ids[cand] for cand in approvals)
+            approved_weights.extend([ballot.weight] * len(approvals))
+
+        candidate_approvals = dict(
+            zip(
+                candidates,
+                tally_weights(approved_ids, approved_weights, len(candidates)),
+            )
+        )
 
         # Order candidates by number of approval votes received
         ranking = scores_into_set_list(candidate_approvals)
@@ -763,9 +1031,7 @@ class SequentialRCV(Election):
         """
         old_election_state = self.state
 
-        IRVrun = STV(
-            old_profile, transfer=seqRCV_transfer, seats=1, tiebreak=self.tiebreak
-        )
+        IRVrun = IRV(old_profile, tiebreak=self.tiebreak)
         old_election = IRVrun.run_election()
         elected_cand = old_election.get_all_winners()[0]
 
@@ -825,6 +1091,10 @@ class Borda(Election):
     `tiebreak`
     :   (Optional) resolves procedural and final ties by specified tiebreak
 
+    `exact`
+    :   (Optional) sums Borda scores as exact fractions if True, else as floats.
+        Defaults to True
+
     **Methods**
     """
 
@@ -835,11 +1105,13 @@ class Borda(Election):
         score_vector: Optional[list[Fraction]],
         ballot_ties: bool = True,
         tiebreak: str = "random",
+        exact: bool = True,
     ):
         super().__init__(profile, ballot_ties)
         self.seats = seats
         self.tiebreak = tiebreak
         self.score_vector = score_vector
+        self.exact = exact
 
     def run_step(self) -> ElectionState:
         """
@@ -850,7 +1122,9 @@ class Borda(Election):
             An ElectionState object for a complete election
         """
         borda_dict = borda_scores(
-            profile=self.state.profile, score_vector=self.score_vector
+            profile=self.state.profile,
+            score_vector=self.score_vector,
+            exact=self.exact,
         )
 
         ranking = scores_into_set_list(borda_dict)
@@ -900,3 +1174,43 @@ class Plurality(SNTV):
         super().__init__(profile, ballot_ties)
         self.seats = seats
         self.tiebreak = tiebreak
+
+
+class IRV(STV):
+    """
+    Single-winner instant runoff election. Inherits methods from `STV` to run
+    the election; with one seat the winner's votes are never transferred, so
+    each round only tallies first place votes and eliminates a candidate
+
+    **Attributes**
+
+    `profile`
+    :   PreferenceProfile to run election on
+
+    `quota`
+    :   formula to calculate quota (defaults to droop)
+
+    `ballot_ties`
+    :   (Optional) resolves input ballot ties if True, else assumes ballots have no ties
+
+    `tiebreak`
+    :   (Optional) resolves procedural and final ties by specified tiebreak
+
+    **Methods**
+    """
+
+    def __init__(
+        self,
+        profile: PreferenceProfile,
+        quota: str = "droop",
+        ballot_ties: bool = True,
+        tiebreak: str = "random",
+    ):
+        super().__init__(
+            profile,
+            transfer=seqRCV_transfer,
+            seats=1,
+            quota=quota,
+            ballot_ties=ballot_ties,
+            tiebreak=tiebreak,
+        )
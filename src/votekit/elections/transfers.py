@@ -1,10 +1,41 @@
+from collections import Counter
 from fractions import Fraction
+import itertools as it
+import numpy as np
 import random
 
 from ..ballot import Ballot
 from ..utils import remove_cand
 
 
+def _ranked_first_mask(winner: str, ballots: list[Ballot]) -> np.ndarray:
+    """
+    Flags the ballots that rank the winner alone in first place
+    """
+    return np.fromiter(
+        (
+            bool(ballot.ranking)
+            and len(ballot.ranking[0]) == 1
+            and winner in ballot.ranking[0]
+            for ballot in ballots
+        ),
+        dtype=bool,
+        count=len(ballots),
+    )
+
+
+def _ranking_after(winner_set: set, ballot: Ballot) -> list[set]:
+    """
+    Ranking of a ballot that ranks the winner alone first, with the winner
+    removed; untouched ranks are shared as in remove_cand
+    """
+    return [
+        s if s.isdisjoint(winner_set) else s - winner_set
+        for s in ballot.ranking[1:]
+        if not s <= winner_set
+    ]
+
+
 def fractional_transfer(
     winner: str, ballots: list[Ballot], votes: dict, threshold: int
 ) -> list[Ballot]:
@@ -21,17 +52,25 @@ def fractional_transfer(
     Returns:
         Modified ballots with transfered weights and the winning canidated removed
     """
-    transfer_value = (votes[winner] - threshold) / votes[winner]
-
-    for ballot in ballots:
-        new_ranking = []
-        if ballot.ranking and ballot.ranking[0] == {winner}:
-            ballot.weight = ballot.weight * transfer_value
-            for cand in ballot.ranking:
-                if cand != {winner}:
-                    new_ranking.append(cand)
-
-    return remove_cand(winner, ballots)
+    transfer_value = Fraction(votes[winner] - threshold) / Fraction(votes[winner])
+
+    # transferring ballots are rebuilt once with the winner already removed,
+    # so remove_cand only has to run over the others
+    transfers = _ranked_first_mask(winner, ballots)
+    others = iter(remove_cand(winner, list(it.compress(ballots, ~transfers))))
+    winner_set = {winner}
+
+    return [
+        Ballot(
+            id=ballot.id,
+            ranking=_ranking_after(winner_set, ballot),
+            weight=ballot.weight * transfer_value,
+            voters=ballot.voters,
+        )
+        if transfer
+        else next(others)
+        for ballot, transfer in zip(ballots, transfers)
+    ]
 
 
 def random_transfer(
@@ -50,32 +89,32 @@ def random_transfer(
         Modified ballots with transfered weights and the winning canidated removed
     """
 
-    # turn all of winner's ballots into (multiple) ballots of weight 1
-    weight_1_ballots = []
-    for ballot in ballots:
-        if ballot.ranking and ballot.ranking[0] == {winner}:
-            # note: under random transfer, weights should always be integers
-            for _ in range(int(ballot.weight)):
-                weight_1_ballots.append(
-                    Ballot(
-                        id=ballot.id,
-                        ranking=ballot.ranking,
-                        weight=Fraction(1),
-                        voters=ballot.voters,
-                    )
-                )
-
-    # remove winner's ballots
-    ballots = [
-        ballot
-        for ballot in ballots
-        if not (ballot.ranking and ballot.ranking[0] == {winner})
-    ]
-
-    surplus_ballots = random.sample(weight_1_ballots, int(votes[winner]) - threshold)
-    ballots += surplus_ballots
-
-    transfered = remove_cand(winner, ballots)
+    # each of the winner's ballots stands for int(weight) ballots of weight 1,
+    # so the surplus is sampled over those copies without building them
+    transfers = _ranked_first_mask(winner, ballots)
+    winner_ballots = list(it.compress(ballots, transfers))
+    # note: under random transfer, weights should always be integers
+    copies = [int(ballot.weight) for ballot in winner_ballots]
+    surplus = Counter(
+        random.sample(
+            range(len(winner_ballots)), int(votes[winner]) - threshold, counts=copies
+        )
+    )
+
+    # remove winner's ballots; the surplus ballots already exclude the winner
+    transfered = remove_cand(winner, list(it.compress(ballots, ~transfers)))
+
+    winner_set = {winner}
+    for i, count in surplus.items():
+        ballot = winner_ballots[i]
+        transfered.append(
+            Ballot(
+                id=ballot.id,
+                ranking=_ranking_after(winner_set, ballot),
+                weight=Fraction(count),
+                voters=ballot.voters,
+            )
+        )
 
     return transfered
 
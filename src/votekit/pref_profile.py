@@ -1,8 +1,10 @@
 import csv
+from collections import defaultdict
 from fractions import Fraction
+from itertools import chain
 import pandas as pd
-from pydantic import BaseModel, validator
-from typing import Optional
+from pydantic import BaseModel, PrivateAttr, validator
+from typing import Optional, Union
 
 from .ballot import Ballot
 
@@ -25,11 +27,27 @@ class PreferenceProfile(BaseModel):
 
     ballots: list[Ballot] = []
     candidates: Optional[list] = None
-    df: pd.DataFrame = pd.DataFrame()
+    _df: Optional[pd.DataFrame] = PrivateAttr(default=None)
+    # df sorted by weight, keyed on whether it is ascending
+    _sorted_dfs: dict = PrivateAttr(default_factory=dict)
+    _candidates: Optional[tuple] = PrivateAttr(default=None)
+    # total weight of each ranking, as returned by to_dict
+    _rank_totals: Optional[dict] = PrivateAttr(default=None)
+    # rendered __str__ text
+    _str: Optional[str] = PrivateAttr(default=None)
+
+    def __init__(self, **data):
+        # lists of Ballots skip pydantic's per-ballot validation
+        ballots = data.get("ballots")
+        if isinstance(ballots, list) and all(isinstance(b, Ballot) for b in ballots):
+            super().__init__(**{**data, "ballots": []})
+            self.ballots = list(ballots)
+        else:
+            super().__init__(**data)
 
     @validator("candidates")
-    def cands_must_be_unique(cls, candidates: list) -> list:
-        if not len(set(candidates)) == len(candidates):
+    def cands_must_be_unique(cls, candidates: Optional[list]) -> Optional[list]:
+        if candidates is not None and not len(set(candidates)) == len(candidates):
             raise ValueError("all candidates must be unique")
         return candidates
 
@@ -43,11 +61,14 @@ class PreferenceProfile(BaseModel):
         """
         Returns list of unique candidates
         """
-        unique_cands: set = set()
-        for ballot in self.ballots:
-            unique_cands.update(*ballot.ranking)
+        # cached as a tuple per set of ballots; callers get their own list
+        if self._candidates is None:
+            unique_cands: set = set()
+            for ballot in self.ballots:
+                unique_cands.update(*ballot.ranking)
+            self._candidates = tuple(unique_cands)
 
-        return list(unique_cands)
+        return list(self._candidates)
 
     # can also cache
     def num_ballots(self) -> Fraction:
@@ -57,11 +78,12 @@ class PreferenceProfile(BaseModel):
         Returns:
             Number of ballots cast
         """
-        num_ballots = Fraction(0)
+        # numerators are summed per denominator to avoid a gcd per Fraction add
+        numerators: defaultdict = defaultdict(int)
         for ballot in self.ballots:
-            num_ballots += ballot.weight
+            numerators[ballot.weight.denominator] += ballot.weight.numerator
 
-        return num_ballots
+        return sum((Fraction(num, den) for den, num in numerators.items()), Fraction(0))
 
     def to_dict(self, standardize: bool) -> dict:
         """
@@ -72,22 +94,42 @@ class PreferenceProfile(BaseModel):
             A dictionary with with ranking (keys) and corresponding total \n
             weights (values)
         """
-        num_ballots = self.num_ballots()
-        di: dict = {}
+        totals = self._group_rankings()
+
+        # totals are exact, so they are scaled once rather than every weight
+        if standardize:
+            num_ballots = sum(totals.values())
+            return {
+                rank_tuple: weight / num_ballots
+                for rank_tuple, weight in totals.items()
+            }
+        return dict(totals)
+
+    def _group_rankings(self) -> dict:
+        """
+        Total weight of each ranking, grouped once per set of ballots and
+        reused by later calls
+        """
+        if self._rank_totals is not None:
+            return self._rank_totals
+
+        # as in num_ballots, numerators are summed per ranking and denominator
+        numerators: defaultdict = defaultdict(int)
         for ballot in self.ballots:
-            rank_tuple = tuple(next(iter(item)) for item in ballot.ranking)
-            if standardize:
-                weight = ballot.weight / num_ballots
-            else:
-                weight = ballot.weight
-            if rank_tuple not in di.keys():
-                di[rank_tuple] = weight
-            else:
-                di[rank_tuple] += weight
-        return di
-
-    class Config:
-        arbitrary_types_allowed = True
+            ranking = ballot.ranking
+            # untied rankings flatten in C; tied ranks keep one candidate each
+            rank_tuple = tuple(chain.from_iterable(ranking))
+            if len(rank_tuple) != len(ranking):
+                rank_tuple = tuple(next(iter(item)) for item in ranking)
+            weight = ballot.weight
+            numerators[rank_tuple, weight.denominator] += weight.numerator
+
+        totals: defaultdict = defaultdict(Fraction)
+        for (rank_tuple, den), num in numerators.items():
+            totals[rank_tuple] += Fraction(num, den)
+
+        self._rank_totals = dict(totals)
+        return self._rank_totals
 
     def to_csv(self, fpath):
         """
@@ -106,26 +148,70 @@ class PreferenceProfile(BaseModel):
         """
         Creates DF for display and building plots
         """
-        weights = []
-        ballots = []
+        rankings = []
         for ballot in self.ballots:
-            part = []
-            for ranking in ballot.ranking:
-                for cand in ranking:
-                    if len(ranking) > 2:
-                        part.append(f"{cand} (Tie)")
-                    else:
-                        part.append(cand)
-            ballots.append(tuple(part))
-            weights.append(int(ballot.weight))
+            # as in to_dict, untied rankings are flattened in C
+            flat = tuple(chain.from_iterable(ballot.ranking))
+            if len(flat) != len(ballot.ranking):
+                flat = tuple(
+                    f"{cand} (Tie)" if len(ranking) > 2 else cand
+                    for ranking in ballot.ranking
+                    for cand in ranking
+                )
+            rankings.append(flat)
+
+        # a categorical stores each distinct ranking once, which only pays off
+        # when rankings repeat; codes come from a dict since pandas hashes
+        # tuples far more slowly
+        ballots: Union[list, pd.Categorical] = rankings
+        codes = dict.fromkeys(rankings, 0)
+        if len(codes) <= len(rankings) // 2:
+            for code, ranking in enumerate(codes):
+                codes[ranking] = code
+            ballots = pd.Categorical.from_codes(
+                [codes[ranking] for ranking in rankings],
+                pd.Index(list(codes), dtype=object, tupleize_cols=False),
+            )
+
+        weights = [int(ballot.weight) for ballot in self.ballots]
+        total = sum(weights)
 
         df = pd.DataFrame({"Ballots": ballots, "Weight": weights})
         # df["Ballots"] = df["Ballots"].astype(str).str.ljust(60)
-        df["Voter Share"] = df["Weight"] / df["Weight"].sum()
-        # fill nans with zero for edge cases
-        df["Voter Share"] = df["Voter Share"].fillna(0.0)
+        # shares are zero for edge cases with no weight
+        df["Voter Share"] = df["Weight"] / total if total else 0.0
         # df["Weight"] = df["Weight"].astype(str).str.rjust(3)
-        return df.reset_index(drop=True)
+        return df
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """
+        DF of the ballots for display and building plots, built on first use
+        """
+        if self._df is None:
+            self._df = self._create_df()
+        return self._df
+
+    def __setattr__(self, name, value):
+        # replacing the ballots drops the cached candidates and frames
+        if name == "ballots":
+            self._candidates = None
+            self._rank_totals = None
+            self._str = None
+            self._df = None
+            self._sorted_dfs = {}
+        super().__setattr__(name, value)
+
+    def _sorted_df(self, ascending: bool) -> pd.DataFrame:
+        """
+        Profile DF sorted by weight, sorted once per order and reused by
+        later calls
+        """
+        if ascending not in self._sorted_dfs:
+            self._sorted_dfs[ascending] = self.df.sort_values(
+                by="Weight", ascending=ascending
+            ).reset_index(drop=True)
+        return self._sorted_dfs[ascending]
 
     def head(
         self, n: int, percents: Optional[bool] = False, totals: Optional[bool] = False
@@ -141,14 +227,7 @@ class PreferenceProfile(BaseModel):
         Returns:
             A dataframe with top-n ballots
         """
-        if self.df.empty:
-            self.df = self._create_df()
-
-        df = (
-            self.df.sort_values(by="Weight", ascending=False)
-            .head(n)
-            .reset_index(drop=True)
-        )
+        df = self._sorted_df(ascending=False).head(n).reset_index(drop=True)
 
         if totals:
             df = _sum_row(df)
@@ -172,14 +251,7 @@ class PreferenceProfile(BaseModel):
         Returns:
             A dataframe with bottom-n ballots
         """
-        if self.df.empty:
-            self.df = self._create_df()
-
-        df = (
-            self.df.sort_values(by="Weight", ascending=True)
-            .head(n)
-            .reset_index(drop=True)
-        )
+        df = self._sorted_df(ascending=True).head(n).reset_index(drop=True)
         if totals:
             df = _sum_row(df)
 
@@ -190,14 +262,12 @@ class PreferenceProfile(BaseModel):
 
     def __str__(self) -> str:
         # Displays top 15 cast ballots or entire profile
+        if self._str is None:
+            self._str = self.head(n=min(len(self.df), 15)).to_string(
+                index=False, justify="justify"
+            )
 
-        if self.df.empty:
-            self.df = self._create_df()
-
-        if len(self.df) < 15:
-            return self.head(n=len(self.df)).to_string(index=False, justify="justify")
-
-        return self.head(n=15).to_string(index=False, justify="justify")
+        return self._str
 
     # set repr to print outputs
     __repr__ = __str__
@@ -206,22 +276,25 @@ class PreferenceProfile(BaseModel):
         """
         Groups ballots by rankings and updates weights
         """
-        class_vector = []
-        seen_rankings = []
+        # group on hashable rankings, in the order first seen
+        rankings: dict = {}
+        # as in num_ballots, numerators are summed per ranking and denominator
+        numerators: defaultdict = defaultdict(int)
         for ballot in self.ballots:
-            if ballot.ranking not in seen_rankings:
-                seen_rankings.append(ballot.ranking)
-            class_vector.append(seen_rankings.index(ballot.ranking))
-
-        new_ballot_list = []
-        for i, ranking in enumerate(seen_rankings):
-            total_weight = 0
-            for j in range(len(class_vector)):
-                if class_vector[j] == i:
-                    total_weight += self.ballots[j].weight
-            new_ballot_list.append(
-                Ballot(ranking=ranking, weight=Fraction(total_weight))
-            )
+            key = tuple(frozenset(s) for s in ballot.ranking)
+            if key not in rankings:
+                rankings[key] = ballot.ranking
+            weight = ballot.weight
+            numerators[key, weight.denominator] += weight.numerator
+
+        weights: defaultdict = defaultdict(Fraction)
+        for (key, den), num in numerators.items():
+            weights[key] += Fraction(num, den)
+
+        new_ballot_list = [
+            Ballot(ranking=rankings[key], weight=Fraction(weight))
+            for key, weight in weights.items()
+        ]
         self.ballots = new_ballot_list
 
     def __eq__(self, other):
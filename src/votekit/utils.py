@@ -1,8 +1,9 @@
-from collections import namedtuple
+from collections import defaultdict, namedtuple
 from fractions import Fraction
 import numpy as np
 from typing import Union, Iterable, Optional, Any
 from itertools import permutations
+from operator import itemgetter
 import math
 
 from .ballot import Ballot
@@ -30,37 +31,97 @@ COLOR_LIST = [
 CandidateVotes = namedtuple("CandidateVotes", ["cand", "votes"])
 
 
-def compute_votes(candidates: list, ballots: list[Ballot]) -> list[CandidateVotes]:
+def compute_votes(
+    candidates: list, ballots: list[Ballot], exact: bool = True
+) -> list[CandidateVotes]:
     """
     Computes first place votes for all candidates in a preference profile
 
     Args:
         candidates: List of all candidates in a PreferenceProfile
         ballots: List of Ballot objects
+        exact: Tallies exact Fractions if True, else float approximations
 
     Returns:
         List of tuples (candidate, number of votes) ordered by first place votes
     """
-    votes = {cand: Fraction(0) for cand in candidates}
+    cand_ids = {cand: i for i, cand in enumerate(candidates)}
+    first_place_ids = []
+    weights = []
 
     for ballot in ballots:
-        if not ballot.ranking:
+        ranking = ballot.ranking
+        if not ranking:
             continue
-        first_place_cand = unset(ballot.ranking[0])
-        if isinstance(first_place_cand, list):
-            for cand in first_place_cand:
-                votes[cand] += ballot.weight / len(first_place_cand)
-        else:
-            votes[first_place_cand] += ballot.weight
+        first_place = ranking[0]
+        if not first_place:
+            continue
+        if len(first_place) == 1:
+            first_place_ids.append(cand_ids[next(iter(first_place))])
+            weights.append(ballot.weight)
+            continue
+        # tied first place splits the ballot's weight evenly
+        weight = ballot.weight / len(first_place)
+        for cand in first_place:
+            first_place_ids.append(cand_ids[cand])
+            weights.append(weight)
+
+    votes = tally_weights(first_place_ids, weights, len(candidates), exact=exact)
 
     ordered = [
         CandidateVotes(cand=key, votes=value)
-        for key, value in sorted(votes.items(), key=lambda x: x[1], reverse=True)
+        for key, value in sorted(
+            zip(candidates, votes), key=itemgetter(1), reverse=True
+        )
     ]
 
     return ordered
 
 
+def tally_weights(
+    ids: Union[list[int], np.ndarray],
+    weights: Union[list[Fraction], np.ndarray],
+    num_ids: int,
+    exact: bool = True,
+) -> list:
+    """
+    Sums weights by integer id, e.g. the votes each candidate receives
+
+    Args:
+        ids: Id that each weight is credited to, in range(num_ids)
+        weights: Weight credited to the matching id
+        num_ids: Number of distinct ids
+        exact: Returns exact Fraction totals if True, else float totals
+
+    Returns:
+        List of totals indexed by id
+    """
+    id_arr = np.array(ids, dtype=np.int64)
+
+    if not exact:
+        totals = np.bincount(
+            id_arr, weights=np.array(weights, dtype=np.float64), minlength=num_ids
+        )
+        return totals.tolist()
+
+    if all(weight.denominator == 1 for weight in weights):
+        # whole-number weights sum exactly in float64, so tally in C
+        totals = np.bincount(
+            id_arr, weights=np.array(weights, dtype=np.float64), minlength=num_ids
+        )
+        return [Fraction(int(total)) for total in totals]
+
+    # Fraction addition reduces by a gcd at every step, so numerators are
+    # summed as ints per id and denominator, then added once per pair
+    numerators: defaultdict = defaultdict(int)
+    for i, weight in zip(id_arr.tolist(), weights):
+        numerators[i, weight.denominator] += weight.numerator
+    fraction_totals = [Fraction(0)] * num_ids
+    for (i, den), num in numerators.items():
+        fraction_totals[i] += Fraction(num, den)
+    return fraction_totals
+
+
 def remove_cand(removed: Union[str, Iterable], ballots: list[Ballot]) -> list[Ballot]:
     """
     Removes specified candidate(s) from ballots
@@ -78,27 +139,25 @@ def remove_cand(removed: Union[str, Iterable], ballots: list[Ballot]) -> list[Ba
     elif isinstance(removed, Iterable):
         remove_set = set(removed)
 
+    # a single candidate is only removed from ballots that rank it alone
+    single = len(remove_set) == 1
+
     update = []
     for ballot in ballots:
-        new_ranking = []
-        if len(remove_set) == 1 and remove_set in ballot.ranking:
-            for s in ballot.ranking:
-                new_s = s.difference(remove_set)
-                if new_s:
-                    new_ranking.append(new_s)
-            update.append(
-                Ballot(
-                    id=ballot.id,
-                    ranking=new_ranking,
-                    weight=ballot.weight,
-                    voters=ballot.voters,
-                )
-            )
-        elif len(remove_set) > 1:
-            for s in ballot.ranking:
-                new_s = s.difference(remove_set)
-                if new_s:
-                    new_ranking.append(new_s)
+        # ballots without a removed candidate are shared as is
+        if (single and remove_set not in ballot.ranking) or (
+            not single
+            and all(s and s.isdisjoint(remove_set) for s in ballot.ranking)
+        ):
+            update.append(ballot)
+        else:
+            # one pass drops the removed candidates and any emptied sets,
+            # reusing the sets that are untouched
+            new_ranking = [
+                s if s.isdisjoint(remove_set) else s - remove_set
+                for s in ballot.ranking
+                if not s <= remove_set
+            ]
             update.append(
                 Ballot(
                     id=ballot.id,
@@ -107,8 +166,6 @@ def remove_cand(removed: Union[str, Iterable], ballots: list[Ballot]) -> list[Ba
                     voters=ballot.voters,
                 )
             )
-        else:
-            update.append(ballot)
 
     return update
 
@@ -144,24 +201,100 @@ def mentions(profile: PreferenceProfile) -> dict:
 
     ballots = profile.get_ballots()
     for ballot in ballots:
+        # converting a Fraction weight is costly, so each ballot converts it once
+        weight = float(ballot.weight)
+        tied_weight = int(ballot.weight)
         for rank in ballot.ranking:
+            if len(rank) > 1:
+                # split mentions for candidates that are tied
+                share = (1 / len(rank)) * tied_weight
+            else:
+                share = weight
             for cand in rank:
                 if cand not in mentions:
                     mentions[cand] = 0
-                if len(rank) > 1:
-                    mentions[cand] += (1 / len(rank)) * int(
-                        ballot.weight
-                    )  # split mentions for candidates that are tied
-                else:
-                    mentions[cand] += float(ballot.weight)
+                mentions[cand] += share
 
     return mentions
 
 
+def _integer_borda_scores(
+    ballots: list[Ballot], candidates: list, score_vector: list[int], exact: bool
+) -> dict:
+    """
+    Borda scores for a whole-number score vector. Each candidate on a ballot
+    is allotted the same float score as in borda_scores; identical
+    (candidate, score) pairs are grouped so the Fraction arithmetic runs once
+    per group rather than once per ballot
+    """
+    cand_ids = {c: i for i, c in enumerate(candidates)}
+    length = len(score_vector)
+    # any run of positions is scored by a difference of prefix sums
+    cum = np.cumsum([0, *score_vector], dtype=np.int64)
+
+    # one (ballot, candidate, position, tied group size) row per ranked entry
+    entries: list[int] = []
+    ends = []
+    for i, ballot in enumerate(ballots):
+        ind = 0
+        for s in ballot.ranking:
+            for c in s:
+                entries += (i, cand_ids[c], ind, len(s))
+            ind += len(s)
+        ends.append(ind)
+    rows, cands, starts, sizes = np.array(entries, dtype=np.int64).reshape(-1, 4).T
+    stops = np.minimum(starts + sizes, length)
+    starts = np.minimum(starts, length)
+    ends_arr = np.minimum(ends, length)
+
+    to_score = Fraction if exact else float
+    weights = np.array([ballot.weight for ballot in ballots], dtype=object)
+    # whole-number weights sum exactly as floats, so they are converted once
+    # here rather than for every entry they are tallied over
+    whole = exact and all(weight.denominator == 1 for weight in weights)
+    if whole or not exact:
+        weights = weights.astype(np.float64)
+    candidate_borda = {c: to_score(0) for c in candidates}
+
+    def grouped(keys: np.ndarray, key_weights: np.ndarray) -> tuple:
+        # distinct key rows and the total weight behind each; rows are packed
+        # into single integers since unique over rows is far slower
+        packed = np.zeros(len(keys), dtype=np.int64)
+        for column in keys.T:
+            packed = packed * (int(column.max()) + 1) + column
+        _, first, inverse = np.unique(packed, return_index=True, return_inverse=True)
+        totals = tally_weights(inverse, key_weights, len(first), exact and not whole)
+        if whole:
+            totals = [Fraction(int(total)) for total in totals]
+        return keys[first].tolist(), totals
+
+    # ranked candidates split the scores of the positions they are tied over
+    if len(rows):
+        keys = np.column_stack((cands, starts, stops, sizes))
+        for (c, start, stop, size), weight in zip(*grouped(keys, weights[rows])):
+            score = float((cum[stop] - cum[start]) / size)
+            candidate_borda[candidates[c]] += to_score(score) * weight
+
+    # incomplete ballots split their leftover scores among unranked candidates
+    unranked = np.ones((len(ballots), len(candidates)), dtype=bool)
+    unranked[rows, cands] = False
+    counts = unranked.sum(axis=1)
+    unranked &= (ends_arr < length)[:, None]
+    left_rows, left_cands = np.nonzero(unranked)
+    if len(left_rows):
+        keys = np.column_stack((left_cands, ends_arr[left_rows], counts[left_rows]))
+        for (c, end, count), weight in zip(*grouped(keys, weights[left_rows])):
+            score = float((cum[length] - cum[end]) / count)
+            candidate_borda[candidates[c]] += to_score(score) * weight
+
+    return candidate_borda
+
+
 def borda_scores(
     profile: PreferenceProfile,
     ballot_length: Optional[int] = None,
     score_vector: Optional[list] = None,
+    exact: bool = True,
 ) -> dict:
     """
     Calculates Borda scores for a PreferenceProfile
@@ -172,6 +305,7 @@ def borda_scores(
             used
         score_vector: Borda weights, if None assigned based length of the
             longest ballot
+        exact: Sums scores as exact fractions if True, else as floats
 
     Returns:
         Dictionary of candidates (keys) and Borda scores (values)
@@ -182,30 +316,47 @@ def borda_scores(
     if score_vector is None:
         score_vector = list(range(ballot_length, 0, -1))
 
-    candidate_borda = {c: Fraction(0) for c in candidates}
+    # whole-number score vectors (the default) give float position scores, so
+    # they can be tallied over arrays with the same results
+    if all(isinstance(score, int) for score in score_vector):
+        return _integer_borda_scores(profile.ballots, candidates, score_vector, exact)
+
+    # floats skip the per-candidate Fraction arithmetic when exactness isn't needed
+    to_score = Fraction if exact else float
+    candidate_borda = {c: to_score(0) for c in candidates}
+    all_candidates = frozenset(candidates)
+    # scores of untied positions and sums of every tail of the score vector, so
+    # ballots don't re-add slices of it; tails are summed in the same order as
+    # the slices were to give the same float results
+    num_scores = len(score_vector)
+    position_scores = [to_score(score) for score in score_vector]
+    tail_sums = [sum(score_vector[i:]) for i in range(num_scores + 1)]
     for ballot in profile.ballots:
+        weight = to_score(ballot.weight)
         current_ind = 0
-        candidates_covered = []
+        candidates_covered: set = set()
         for s in ballot.ranking:
             position_size = len(s)
-            local_score_vector = score_vector[current_ind : current_ind + position_size]
-            borda_allocation = sum(local_score_vector) / position_size
+            if position_size == 1 and current_ind < num_scores:
+                points = position_scores[current_ind] * weight
+            else:
+                local_score_vector = score_vector[
+                    current_ind : current_ind + position_size
+                ]
+                borda_allocation = sum(local_score_vector) / position_size
+                points = to_score(borda_allocation) * weight
             for c in s:
-                candidate_borda[c] += Fraction(borda_allocation) * ballot.weight
+                candidate_borda[c] += points
             current_ind += position_size
-            candidates_covered += list(s)
+            candidates_covered.update(s)
 
         # If ballot was incomplete, evenly allocation remaining points
-        if current_ind < len(score_vector):
-            remainder_cands = set(candidates).difference(set(candidates_covered))
-            remainder_score_vector = score_vector[current_ind:]
-            remainder_borda_allocation = sum(remainder_score_vector) / len(
-                remainder_cands
-            )
+        remainder_cands = all_candidates - candidates_covered
+        if current_ind < num_scores and remainder_cands:
+            remainder_borda_allocation = tail_sums[current_ind] / len(remainder_cands)
+            points = to_score(remainder_borda_allocation) * weight
             for c in remainder_cands:
-                candidate_borda[c] += (
-                    Fraction(remainder_borda_allocation) * ballot.weight
-                )
+                candidate_borda[c] += points
 
     return candidate_borda
 
@@ -15,6 +15,7 @@ from votekit.ballot_generator import (
     CambridgeSampler,
     OneDimSpatial,
     BallotSimplex,
+    CachedChoice,
 )
 from votekit.pref_profile import PreferenceProfile
 
@@ -28,6 +29,22 @@ def test_IC_completion():
     assert type(profile) is PreferenceProfile
 
 
+def test_IC_many_candidates():
+    cands = [f"C{i}" for i in range(12)]
+    ic = ImpartialCulture(candidates=cands, ballot_length=3)
+    profile = ic.generate_profile(number_of_ballots=100)
+    assert profile.num_ballots() == 100
+    assert all(len(b.ranking) == 3 for b in profile.ballots)
+
+
+def test_IAC_many_candidates():
+    cands = [f"C{i}" for i in range(10)]
+    iac = ImpartialAnonymousCulture(candidates=cands)
+    profile = iac.generate_profile(number_of_ballots=100)
+    assert profile.num_ballots() == 100
+    assert all(len(b.ranking) == 10 for b in profile.ballots)
+
+
 def test_IAC_completion():
     iac = ImpartialAnonymousCulture(
         candidates=["W1", "W2", "C1", "C2"], ballot_length=None
@@ -50,6 +67,25 @@ def test_PL_completion():
     assert type(profile) is PreferenceProfile
 
 
+def test_PL_follows_reassigned_interval():
+    pl = PlackettLuce(
+        candidates=["W1", "W2", "C1"],
+        pref_interval_by_bloc={"W": {"W1": 0.4, "W2": 0.3, "C1": 0.3}},
+        bloc_voter_prop={"W": 1},
+    )
+    pl.generate_profile(number_of_ballots=10)
+    pl.pref_interval_by_bloc = {"W": {"W1": 0, "W2": 1, "C1": 0}}
+    profile = pl.generate_profile(number_of_ballots=10)
+    assert all(ballot.ranking[0] == {"W2"} for ballot in profile.ballots)
+
+
+def test_empty_cached_choice():
+    sampler = CachedChoice([], [])
+    assert len(sampler.sample_with_replacement(0)) == 0
+    with pytest.raises(ValueError):
+        sampler.sample_with_replacement(1)
+
+
 def test_BT_completion():
     bt = BradleyTerry(
         candidates=["W1", "W2", "C1", "C2"],
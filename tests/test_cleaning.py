@@ -18,6 +18,17 @@ def test_remove_empty_ballots():
     assert ballot.ranking == [{"A"}, {"B"}, {"C"}]
 
 
+def test_remove_empty_ballots_copies_rankings():
+    profile = PreferenceProfile(
+        ballots=[Ballot(ranking=[{"A"}, {"B"}], weight=Fraction(1), voters={"tom"})]
+    )
+    ballot = remove_empty_ballots(profile).get_ballots()[0]
+    ballot.ranking[0].add("C")
+    ballot.voters.add("andy")
+    assert profile.get_ballots()[0].ranking == [{"A"}, {"B"}]
+    assert profile.get_ballots()[0].voters == {"tom"}
+
+
 def test_deduplicate_single():
     dirty = PreferenceProfile(
         ballots=[Ballot(ranking=[{"A"}, {"A"}, {"B"}, {"C"}], weight=Fraction(1))]
@@ -4,8 +4,12 @@ import pytest
 
 from votekit.ballot import Ballot
 from votekit.cvr_loaders import load_blt, load_csv  # type:ignore
-from votekit.elections.election_types import STV, SequentialRCV
-from votekit.elections.transfers import fractional_transfer, random_transfer
+from votekit.elections.election_types import IRV, STV, SequentialRCV
+from votekit.elections.transfers import (
+    fractional_transfer,
+    random_transfer,
+    seqRCV_transfer,
+)
 from votekit.pref_profile import PreferenceProfile
 from votekit.utils import (
     remove_cand,
@@ -90,6 +94,25 @@ def test_min_votes_mn():
     assert max_votes[0] == min_cand
 
 
+def test_votes_skip_empty_first_rank():
+    ballots = [
+        Ballot(ranking=[set(), {"a"}], weight=Fraction(1)),
+        Ballot(ranking=[{"b"}], weight=Fraction(2)),
+    ]
+    results = {cand: votes for cand, votes in compute_votes(["a", "b"], ballots)}
+    assert results == {"a": Fraction(0), "b": Fraction(2)}
+
+
+def test_inexact_votes():
+    ballots = [
+        Ballot(ranking=[{"a"}], weight=Fraction(1, 3)),
+        Ballot(ranking=[{"a", "b"}], weight=Fraction(1)),
+    ]
+    results = dict(compute_votes(["a", "b"], ballots, exact=False))
+    assert all(isinstance(votes, float) for votes in results.values())
+    assert results == pytest.approx({"a": 5 / 6, "b": 1 / 2})
+
+
 def test_remove_cand_not_inplace():
     remove = "a"
     ballots = test_profile.get_ballots()
@@ -104,6 +127,26 @@ def test_remove_fake_cand():
     assert ballots == new_ballots
 
 
+def test_remove_cand_shares_untouched_ballots():
+    ballots = [
+        Ballot(ranking=[{"a"}, {"b"}], weight=Fraction(1)),
+        Ballot(ranking=[{"b"}, {"c"}], weight=Fraction(2)),
+    ]
+    new_ballots = remove_cand("c", ballots)
+    assert new_ballots[0] is ballots[0]
+    assert new_ballots[1] is not ballots[1]
+    assert new_ballots[1].ranking == [{"b"}]
+    assert new_ballots[1].ranking[0] is ballots[1].ranking[0]
+
+
+def test_remove_cand_keeps_ties():
+    ballots = [Ballot(ranking=[{"a", "b"}, {"c"}], weight=Fraction(1))]
+    # a single candidate is only removed where it is ranked alone
+    assert remove_cand("a", ballots)[0] is ballots[0]
+    new_ballots = remove_cand(["a", "c"], ballots)
+    assert new_ballots[0].ranking == [{"b"}]
+
+
 def test_remove_and_shift():
     remove = "a"
     ballots = test_profile.get_ballots()
@@ -127,6 +170,99 @@ def test_stv_winner_mn():
     assert winners == outcome.get_all_winners()
 
 
+def test_stv_inexact_winner_mn():
+    irv = STV(mn_profile, fractional_transfer, 3, ballot_ties=False, exact=False)
+    outcome = irv.run_election()
+    winners = [{"BETSY HODGES"}, {"MARK ANDREW"}, {"DON SAMUELS"}]
+    assert winners == outcome.get_all_winners()
+
+
+def test_stv_inexact_tied_ballots_match_exact():
+    ballots = [
+        Ballot(ranking=[{"A", "B", "D"}, {"C"}], weight=Fraction(2)),
+        Ballot(ranking=[{"A"}, {"C"}, {"B"}], weight=Fraction(4)),
+        Ballot(ranking=[{"C"}, {"B"}], weight=Fraction(2)),
+        Ballot(ranking=[{"B"}, {"A"}], weight=Fraction(2)),
+    ]
+    profile = PreferenceProfile(ballots=ballots)
+    # A is elected first with 14/3 votes, which no float holds exactly
+    exact = STV(profile, fractional_transfer, 2, ballot_ties=False).run_step()
+    inexact = STV(
+        profile, fractional_transfer, 2, ballot_ties=False, exact=False
+    ).run_step()
+    assert exact.elected == inexact.elected == [{"A"}]
+    assert exact.profile.ballots == inexact.profile.ballots
+
+
+def test_stv_matrix_matches_ballot_transfer():
+    # wrapping the transfer forces the ballot-by-ballot path
+    def wrapped_transfer(*args):
+        return fractional_transfer(*args)
+
+    fast = STV(mn_profile, fractional_transfer, 3, ballot_ties=False).run_election()
+    slow = STV(mn_profile, wrapped_transfer, 3, ballot_ties=False).run_election()
+    assert fast.get_all_winners() == slow.get_all_winners()
+    assert fast.get_all_eliminated() == slow.get_all_eliminated()
+    assert fast.profile == slow.profile
+
+
+def test_stv_matrix_matches_seqRCV_transfer():
+    def wrapped_transfer(*args):
+        return seqRCV_transfer(*args)
+
+    fast = STV(test_profile, seqRCV_transfer, 1, ballot_ties=False).run_election()
+    slow = STV(test_profile, wrapped_transfer, 1, ballot_ties=False).run_election()
+    assert fast.get_all_winners() == slow.get_all_winners()
+    assert fast.get_all_eliminated() == slow.get_all_eliminated()
+    assert fast.profile == slow.profile
+
+
+def test_stv_merges_duplicate_ballots():
+    ballots = [
+        Ballot(ranking=[{"A"}, {"B"}], weight=Fraction(1)),
+        Ballot(ranking=[{"A"}, {"B"}], weight=Fraction(1)),
+        Ballot(ranking=[{"B"}, {"C"}], weight=Fraction(1)),
+        Ballot(ranking=[{"C"}], weight=Fraction(1, 2)),
+    ]
+    profile = PreferenceProfile(ballots=ballots, candidates=["A", "B", "C", "D"])
+    election = STV(profile, fractional_transfer, 1)
+    assert election.state.profile.candidates == profile.candidates
+    merged = election.state.profile.ballots
+    assert len(merged) == 3
+    assert Ballot(ranking=[{"A"}, {"B"}], weight=Fraction(2)) in merged
+
+    outcome = election.run_election()
+    assert outcome.get_all_winners() == [{"A"}]
+
+
+def test_stv_matrix_ballots_own_their_rankings():
+    ballots = [
+        Ballot(ranking=[{"A"}, {"B"}], weight=Fraction(1)),
+        Ballot(ranking=[{"A"}, {"B"}], weight=Fraction(1)),
+        Ballot(ranking=[{"B"}, {"C"}], weight=Fraction(1)),
+        Ballot(ranking=[{"C"}, {"B"}], weight=Fraction(1)),
+    ]
+    election = STV(PreferenceProfile(ballots=ballots), fractional_transfer, 2)
+    for state in (election.state, election.run_step()):
+        sets = [s for ballot in state.profile.ballots for s in ballot.ranking]
+        assert len({id(s) for s in sets}) == len(sets)
+
+
+def test_stv_condenses_tied_ballots():
+    ballots = [
+        Ballot(ranking=[{"A", "B"}, {"C"}], weight=Fraction(1)),
+        Ballot(ranking=[{"A", "B"}, {"C"}], weight=Fraction(1)),
+        Ballot(ranking=[{"C"}, {"A"}], weight=Fraction(3)),
+    ]
+    election = STV(
+        PreferenceProfile(ballots=ballots), fractional_transfer, 1, ballot_ties=False
+    )
+    assert len(election.state.profile.ballots) == 2
+
+    outcome = election.run_election()
+    assert outcome.get_all_winners() == [{"C"}]
+
+
 def test_runstep_seats_full_at_start():
     mock = STV(test_profile, fractional_transfer, 9, ballot_ties=False)
     step = mock._profile
@@ -151,6 +287,26 @@ def test_rand_transfer_func_mock_data():
     assert counts[0].votes == Fraction(1) or counts[0].votes == Fraction(2)
 
 
+def test_frac_transfer_scales_winner_ballots():
+    winner = "A"
+    ballots = [
+        Ballot(ranking=({"A"}, {"C"}, {"B"}), weight=Fraction(2)),
+        Ballot(ranking=({"B"}, {"A"}, {"C"}), weight=Fraction(1)),
+    ]
+    votes = {"A": 2, "B": 1}
+    threshold = 1
+
+    ballots_after_transfer = fractional_transfer(
+        winner=winner, ballots=ballots, votes=votes, threshold=threshold
+    )
+
+    assert ballots_after_transfer[0].ranking == [{"C"}, {"B"}]
+    assert ballots_after_transfer[0].weight == Fraction(1)
+    assert ballots_after_transfer[1].weight == Fraction(1)
+    # the input ballots are left untouched
+    assert ballots[0].weight == Fraction(2)
+
+
 def test_rand_transfer_assert():
     winner = "A"
     ballots = [
@@ -168,6 +324,22 @@ def test_rand_transfer_assert():
     assert 400 < counts[0].votes < 600
 
 
+def test_rand_transfer_groups_surplus():
+    ballots = [
+        Ballot(ranking=({"A"}, {"C"}, {"B"}), weight=Fraction(1000)),
+        Ballot(ranking=({"B"}, {"A"}), weight=Fraction(3)),
+    ]
+
+    ballots_after_transfer = random_transfer(
+        winner="A", ballots=ballots, votes={"A": 1000}, threshold=400
+    )
+
+    assert len(ballots_after_transfer) == 2
+    assert ballots_after_transfer[0].ranking == [{"B"}]
+    assert ballots_after_transfer[1].ranking == [{"C"}, {"B"}]
+    assert ballots_after_transfer[1].weight == Fraction(600)
+
+
 def test_toy_rcv():
     """
     example toy election taken from David McCune's code with known winners c and d
@@ -188,3 +360,10 @@ def test_toy_rcv():
     seq_RCV = SequentialRCV(profile=toy_pp, seats=2, ballot_ties=False)
     toy_winners = seq_RCV.run_election().get_all_winners()
     assert known_winners == toy_winners
+
+
+def test_irv_matches_single_seat_stv():
+    irv = IRV(test_profile, ballot_ties=False).run_election()
+    stv = STV(test_profile, fractional_transfer, 1, ballot_ties=False).run_election()
+    assert irv.get_all_winners() == stv.get_all_winners()
+    assert irv.get_all_eliminated() == stv.get_all_eliminated()
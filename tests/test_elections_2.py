@@ -163,3 +163,12 @@ def test_borda_three_winner():
     compare_io_borda(
         profile=TEST_PROFILE_B, seats=3, score_vector=None, target_state=borda_target1
     )
+
+
+def test_borda_inexact_matches_exact():
+    exact = et.Borda(TEST_PROFILE_B, 3, score_vector=None, tiebreak="none")
+    inexact = et.Borda(
+        TEST_PROFILE_B, 3, score_vector=None, tiebreak="none", exact=False
+    )
+    outcome = inexact.run_election()
+    assert outcome.get_all_winners() == exact.run_election().get_all_winners()
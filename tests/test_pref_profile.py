@@ -27,6 +27,17 @@ def test_unique_cands():
     assert len(cands) == len(unique_cands)
 
 
+def test_cached_cands_follow_replaced_ballots():
+    profile = PreferenceProfile(
+        ballots=[Ballot(ranking=[{"A"}, {"B"}], weight=Fraction(1))]
+    )
+    cands = profile.get_candidates()
+    cands.remove("A")
+    assert set(profile.get_candidates()) == {"A", "B"}
+    profile.ballots = [Ballot(ranking=[{"C"}], weight=Fraction(1))]
+    assert profile.get_candidates() == ["C"]
+
+
 def test_updates_not_in_place():
     before = test_profile.get_ballots()
     remove = "a"
@@ -40,6 +51,22 @@ def test_to_dict():
     assert rv[("b", "a", "e")] == Fraction(1, 1)
 
 
+def test_to_dict_follows_replaced_ballots():
+    profile = PreferenceProfile(
+        ballots=[
+            Ballot(ranking=[{"A"}, {"B"}], weight=Fraction(1)),
+            Ballot(ranking=[{"B"}], weight=Fraction(3)),
+        ]
+    )
+    profile.to_dict(standardize=False)[("A", "B")] = Fraction(5)
+    assert profile.to_dict(standardize=True) == {
+        ("A", "B"): Fraction(1, 4),
+        ("B",): Fraction(3, 4),
+    }
+    profile.ballots = [Ballot(ranking=[{"C"}], weight=Fraction(2))]
+    assert profile.to_dict(standardize=False) == {("C",): Fraction(2)}
+
+
 def test_condense_profile():
     profile = PreferenceProfile(
         ballots=[
@@ -53,6 +80,21 @@ def test_condense_profile():
     )
 
 
+def test_condense_profile_keeps_first_seen_order():
+    profile = PreferenceProfile(
+        ballots=[
+            Ballot(ranking=[{"A", "B"}, {"C"}], weight=Fraction(1)),
+            Ballot(ranking=[{"C"}], weight=Fraction(1, 2)),
+            Ballot(ranking=[{"B", "A"}, {"C"}], weight=Fraction(2)),
+        ]
+    )
+    profile.condense_ballots()
+    assert profile.ballots == [
+        Ballot(ranking=[{"A", "B"}, {"C"}], weight=Fraction(3)),
+        Ballot(ranking=[{"C"}], weight=Fraction(1, 2)),
+    ]
+
+
 def test_profile_equals():
     profile1 = PreferenceProfile(
         ballots=[
@@ -70,6 +112,14 @@ def test_profile_equals():
     assert profile1 == profile2
 
 
+def test_equal_tied_ballots_hash_equal():
+    for i in range(50):
+        ballot1 = Ballot(ranking=[{"A", f"B{i}"}, {"C"}], weight=Fraction(1))
+        ballot2 = Ballot(ranking=[{f"B{i}", "A"}, {"C"}], weight=Fraction(1))
+        assert ballot1 == ballot2
+        assert hash(ballot1) == hash(ballot2)
+
+
 def test_create_df():
     profile = PreferenceProfile(
         ballots=[
@@ -103,3 +153,30 @@ def test_df_percents():
     assert "Voter Share" in rv
     rv = profile.head(2)
     assert "Voter Share" not in rv
+
+
+def test_head_tail_follow_replaced_ballots():
+    profile = PreferenceProfile(
+        ballots=[
+            Ballot(ranking=[{"A"}, {"B"}], weight=Fraction(1)),
+            Ballot(ranking=[{"B"}, {"A"}], weight=Fraction(2)),
+            Ballot(ranking=[{"A"}, {"B"}], weight=Fraction(2)),
+        ]
+    )
+    assert profile.head(1)["Weight"][0] == 2
+    assert profile.tail(1)["Weight"][0] == 1
+    profile.condense_ballots()
+    assert profile.head(1)["Weight"][0] == 3
+    assert profile.tail(1)["Weight"][0] == 2
+    assert len(profile.df) == 2
+
+
+def test_copied_profile_keeps_its_own_df():
+    profile = PreferenceProfile(
+        ballots=[Ballot(ranking=[{"A"}, {"B"}], weight=Fraction(1))]
+    )
+    profile.head(1)
+    copied = profile.copy()
+    profile.ballots = [Ballot(ranking=[{"C"}], weight=Fraction(2))]
+    assert profile.head(1)["Weight"][0] == 2
+    assert copied.head(1)["Weight"][0] == 1
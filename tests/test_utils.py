@@ -97,6 +97,22 @@ def test_borda_short_ballot():
     assert method_borda_dict == target_borda_dict
 
 
+def test_borda_ties_and_fractional_weights():
+    ties = PreferenceProfile(
+        ballots=[
+            Ballot(ranking=[{"A", "B"}, {"C"}], weight=Fraction(1, 2)),
+            Ballot(ranking=[{"C"}], weight=Fraction(1)),
+        ]
+    )
+    target_borda_dict = {
+        "A": Fraction(11, 4),
+        "B": Fraction(11, 4),
+        "C": Fraction(7, 2),
+    }
+    assert borda_scores(ties, ballot_length=3) == target_borda_dict
+    assert borda_scores(ties, ballot_length=3, exact=False) == target_borda_dict
+
+
 # def test_candidate_position_dict():
 #     assert True
 